@@ -0,0 +1,223 @@
+# admission_control.py - Load shedding and priority lanes based on event-loop lag
+import json
+import math
+import threading
+import time
+
+from werkzeug.exceptions import HTTPException
+
+# Lanes, from most to least important
+PRIORITY = 'priority'
+NORMAL = 'normal'
+LOW = 'low'
+
+# Door commands, health/ops probes and message sends always get the reserved lane
+PRIORITY_ENDPOINTS = {
+    'api.door_op',
+    'api.health_check',
+    'api.readiness_check',
+    'api.admission_stats',
+    'api.create_message',
+}
+
+# History reads, exports and user listings are shed first under overload
+LOW_ENDPOINTS = {
+    'api.get_messages',
+    'api.get_users',
+    'api.get_room_details',
+}
+
+PRIORITY_EVENTS = {'send_message'}
+LOW_EVENTS = {'get_room_info'}
+
+
+class AdmissionController:
+    """Admission control that sheds low-priority work when the hub is overloaded.
+
+    Overload is measured two ways: event-loop lag (how late a background
+    greenthread wakes up from a fixed sleep, smoothed with an EWMA) and the
+    number of REST requests and Socket.IO events currently in flight.
+    Low-priority work is shed once lag passes max_lag_ms or in-flight work
+    reaches the lower low_max_in_flight cap, normal work once lag passes
+    normal_shed_lag_ms or the in-flight limit is reached, and priority work
+    is admitted until the extra reserved slots are used up as well.
+    """
+
+    def __init__(self, socketio, max_in_flight=32, priority_reserve=8,
+                 low_max_in_flight=None, max_lag_ms=200, normal_shed_lag_ms=500,
+                 probe_interval=0.1, retry_after=1, lag_smoothing=0.3):
+        self.socketio = socketio
+        self.max_in_flight = max_in_flight
+        # LOW work stops early so it can't take every slot from NORMAL work
+        self.low_max_in_flight = low_max_in_flight if low_max_in_flight is not None else max_in_flight // 2
+        self.priority_reserve = priority_reserve
+        self.max_lag_ms = max_lag_ms
+        self.normal_shed_lag_ms = normal_shed_lag_ms
+        self.probe_interval = probe_interval
+        self.retry_after = retry_after
+        self.lag_smoothing = lag_smoothing
+
+        self.in_flight = 0
+        self.lag_ms = 0.0
+        self.max_observed_lag_ms = 0.0
+        self.counters = {
+            'admitted': {PRIORITY: 0, NORMAL: 0, LOW: 0},
+            'shed': {PRIORITY: 0, NORMAL: 0, LOW: 0},
+        }
+        self._lock = threading.Lock()
+        self._probe_started = False
+
+    def start(self):
+        """Start the background greenthread that measures event-loop lag"""
+        if self._probe_started:
+            return
+        self._probe_started = True
+        self.socketio.start_background_task(self._probe_lag)
+
+    def _probe_lag(self):
+        """Sleep for a fixed interval and record how late we were woken up"""
+        while True:
+            started = time.monotonic()
+            self.socketio.sleep(self.probe_interval)
+            elapsed = time.monotonic() - started
+            self.record_lag_sample(max(0.0, (elapsed - self.probe_interval) * 1000))
+
+    def record_lag_sample(self, sample_ms):
+        """Fold a raw lag sample into the EWMA so a single GC pause doesn't trigger shedding"""
+        self.lag_ms += self.lag_smoothing * (sample_ms - self.lag_ms)
+        self.max_observed_lag_ms = max(self.max_observed_lag_ms, sample_ms)
+
+    def lane_for_endpoint(self, endpoint):
+        """Classify a Flask endpoint name into a lane"""
+        if endpoint in PRIORITY_ENDPOINTS:
+            return PRIORITY
+        if endpoint in LOW_ENDPOINTS:
+            return LOW
+        return NORMAL
+
+    def lane_for_event(self, event):
+        """Classify a Socket.IO event name into a lane"""
+        if event in PRIORITY_EVENTS:
+            return PRIORITY
+        if event in LOW_EVENTS:
+            return LOW
+        return NORMAL
+
+    def is_lagging(self):
+        return self.lag_ms > self.max_lag_ms
+
+    def _should_shed(self, lane, in_flight):
+        if lane == PRIORITY:
+            return in_flight >= self.max_in_flight + self.priority_reserve
+        if lane == NORMAL:
+            return self.lag_ms > self.normal_shed_lag_ms or in_flight >= self.max_in_flight
+        return self.is_lagging() or in_flight >= self.low_max_in_flight
+
+    def try_acquire(self, lane):
+        """Reserve an in-flight slot for a request or event; returns False if it was shed"""
+        with self._lock:
+            if self._should_shed(lane, self.in_flight):
+                self.counters['shed'][lane] += 1
+                return False
+            self.in_flight += 1
+            self.counters['admitted'][lane] += 1
+            return True
+
+    def release(self):
+        """Free an in-flight slot taken by try_acquire"""
+        with self._lock:
+            if self.in_flight <= 0:
+                print("❌ AdmissionController.release called with no slot in flight (double release?)")
+                return
+            self.in_flight -= 1
+
+    def get_retry_after(self):
+        """Seconds a shed client should wait, scaled up while the loop is lagging"""
+        return max(self.retry_after, math.ceil(self.lag_ms / 1000))
+
+    def get_stats(self):
+        """Snapshot of the shedding counters and current load"""
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'low_max_in_flight': self.low_max_in_flight,
+                'priority_reserve': self.priority_reserve,
+                'lag_ms': round(self.lag_ms, 2),
+                'max_observed_lag_ms': round(self.max_observed_lag_ms, 2),
+                'max_lag_ms': self.max_lag_ms,
+                'normal_shed_lag_ms': self.normal_shed_lag_ms,
+                'lagging': self.is_lagging(),
+                'admitted': dict(self.counters['admitted']),
+                'shed': dict(self.counters['shed'])
+            }
+
+
+class AdmissionMiddleware:
+    """WSGI middleware that holds an in-flight slot until the response body is fully sent.
+
+    Flask's before_request/teardown_request hooks finish before the body is
+    written, so they undercount in-flight work; wrapping app.wsgi_app doesn't.
+    """
+
+    def __init__(self, wsgi_app, admission, url_map):
+        self.wsgi_app = wsgi_app
+        self.admission = admission
+        self.url_map = url_map
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'OPTIONS':
+            return self.wsgi_app(environ, start_response)
+        try:
+            endpoint, _ = self.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            # Unknown routes (including /socket.io) are left to the app
+            return self.wsgi_app(environ, start_response)
+
+        lane = self.admission.lane_for_endpoint(endpoint)
+        if not self.admission.try_acquire(lane):
+            return self._overloaded(lane, start_response)
+
+        try:
+            result = self.wsgi_app(environ, start_response)
+        except Exception:
+            self.admission.release()
+            raise
+        return _ReleasingIterable(result, self.admission.release)
+
+    def _overloaded(self, lane, start_response):
+        retry_after = self.admission.get_retry_after()
+        body = json.dumps({
+            'error': 'Server overloaded, try again later',
+            'lane': lane,
+            'retry_after': retry_after
+        }).encode('utf-8')
+        # Flask-CORS never sees this response, so add its header here
+        start_response('503 Service Unavailable', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Retry-After', str(retry_after)),
+            ('Access-Control-Allow-Origin', '*')
+        ])
+        return [body]
+
+
+class _ReleasingIterable:
+    """Response iterable that frees the admission slot when the server closes it"""
+
+    def __init__(self, iterable, release):
+        self.iterable = iterable
+        self.release = release
+        self.released = False
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, 'close'):
+                self.iterable.close()
+        finally:
+            if not self.released:
+                self.released = True
+                self.release()
@@ -2,7 +2,7 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 
-def create_api_blueprint(data_store, socketio):
+def create_api_blueprint(data_store, socketio, readiness, profiler, admission=None):
     """Create REST API blueprint for Flask-SocketIO"""
     
     api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -13,17 +13,40 @@ def create_api_blueprint(data_store, socketio):
     @api_bp.route('/health', methods=['GET'])
     def health_check():
         print("🔍 DEBUG: /api/health route hit!")  # Debug log
+        # A warm-up task that failed for good means this worker should be recycled
+        healthy = not readiness.failed
         response = jsonify({
-            'status': 'healthy',
+            'status': 'healthy' if healthy else 'unhealthy',
+            'warmup_errors': dict(readiness.errors),
             'server': 'Flask-SocketIO + eventlet + single CORS',
             'connected_users': len(data_store.users),
             'active_rooms': len(data_store.rooms),
             'total_messages': len(data_store.messages),
             'timestamp': datetime.now().isoformat()
         })
+        if not healthy:
+            response.status_code = 503
         print(f"🔍 DEBUG: Response headers from route: {dict(response.headers)}")  # Debug log
         return response
     
+    @api_bp.route('/ready', methods=['GET'])
+    def readiness_check():
+        # Unlike /health (process is alive), /ready only passes once warm-up is done
+        status = readiness.get_status()
+        status['startup'] = profiler.get_report()
+        status['timestamp'] = datetime.now().isoformat()
+        response = jsonify(status)
+        if not status['ready']:
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+        return response
+    
+    # Only exposed when admission control is enabled
+    if admission:
+        @api_bp.route('/admission', methods=['GET'])
+        def admission_stats():
+            return jsonify(admission.get_stats())
+    
     @api_bp.route('/door', methods=['GET'])
     def door_op():
         print("🔍 DEBUG: /api/door route hit!")  # Debug log
@@ -1,18 +1,28 @@
 # server.py - Main Server File
-import eventlet
-eventlet.monkey_patch()
+import os
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from flask_socketio import SocketIO
-from datetime import datetime
+# Startup profiling starts before anything heavy is imported
+from startup import StartupProfiler, Readiness
+profiler = StartupProfiler(budget_ms=int(os.environ.get('STARTUP_BUDGET_MS', 1500)))
+
+with profiler.phase('import eventlet + monkey_patch'):
+    import eventlet
+    eventlet.monkey_patch()
+    from eventlet import tpool
 
-# Import blueprints
-from api_blueprint_flask import create_api_blueprint
-from socketio_blueprint_flask import SocketIOBlueprint
+with profiler.phase('import flask, flask_cors, flask_socketio'):
+    from flask import Flask, request, jsonify
+    from flask_cors import CORS
+    from flask_socketio import SocketIO
+from datetime import datetime
 
-# Shared data store (use database in production)
-from data_store import DataStore
+with profiler.phase('import app modules'):
+    # Import blueprints
+    from api_blueprint_flask import create_api_blueprint
+    from socketio_blueprint_flask import SocketIOBlueprint
+    
+    # Shared data store (use database in production)
+    from data_store import DataStore
 
 def create_app():
     """Create and configure the Flask app with Flask-SocketIO"""
@@ -21,6 +31,16 @@ def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'your-secret-key-here'
     
+    # Admission control limits (shed low-priority work past these)
+    app.config['ADMISSION_ENABLED'] = os.environ.get('ADMISSION_ENABLED', '1') != '0'
+    app.config['ADMISSION_MAX_IN_FLIGHT'] = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 32))
+    app.config['ADMISSION_PRIORITY_RESERVE'] = int(os.environ.get('ADMISSION_PRIORITY_RESERVE', 8))
+    app.config['ADMISSION_LOW_MAX_IN_FLIGHT'] = int(os.environ.get('ADMISSION_LOW_MAX_IN_FLIGHT', 16))
+    app.config['ADMISSION_MAX_LAG_MS'] = float(os.environ.get('ADMISSION_MAX_LAG_MS', 200))
+    app.config['ADMISSION_NORMAL_SHED_LAG_MS'] = float(os.environ.get('ADMISSION_NORMAL_SHED_LAG_MS', 500))
+    app.config['ADMISSION_PROBE_INTERVAL'] = float(os.environ.get('ADMISSION_PROBE_INTERVAL', 0.1))
+    app.config['ADMISSION_RETRY_AFTER'] = int(os.environ.get('ADMISSION_RETRY_AFTER', 1))
+    
     # ONLY use Flask-CORS at app level - remove duplicate CORS handling
     CORS(app, origins="*", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     
@@ -48,28 +68,60 @@ def create_app():
     # Initialize shared data store
     data_store = DataStore()
     
+    # Warm-up tasks run in the background while the server already serves;
+    # /api/ready reports 503 until they are done. Register state loaders here
+    # (e.g. persistence) with readiness.add_task(name, func); they run on a
+    # native thread via tpool so they don't stall the event loop.
+    readiness = Readiness(executor=tpool.execute)
+    
+    # Admission control can be switched off with ADMISSION_ENABLED=0
+    admission = None
+    if app.config['ADMISSION_ENABLED']:
+        with profiler.phase('admission control'):
+            from admission_control import AdmissionController, AdmissionMiddleware
+            
+            # Measure hub lag and in-flight requests, shed low-priority work
+            admission = AdmissionController(
+                socketio,
+                max_in_flight=app.config['ADMISSION_MAX_IN_FLIGHT'],
+                priority_reserve=app.config['ADMISSION_PRIORITY_RESERVE'],
+                low_max_in_flight=app.config['ADMISSION_LOW_MAX_IN_FLIGHT'],
+                max_lag_ms=app.config['ADMISSION_MAX_LAG_MS'],
+                normal_shed_lag_ms=app.config['ADMISSION_NORMAL_SHED_LAG_MS'],
+                probe_interval=app.config['ADMISSION_PROBE_INTERVAL'],
+                retry_after=app.config['ADMISSION_RETRY_AFTER']
+            )
+            admission.start()
+            
+            # Count in-flight requests around the whole WSGI response, not just the view
+            app.wsgi_app = AdmissionMiddleware(app.wsgi_app, admission, app.url_map)
+    
     # Create and register REST API blueprint
-    api_bp = create_api_blueprint(data_store, socketio)
+    api_bp = create_api_blueprint(data_store, socketio, readiness, profiler, admission)
     app.register_blueprint(api_bp)
-    print(f"🔍 DEBUG: Registered API blueprint with routes: {[rule.rule for rule in app.url_map.iter_rules() if rule.rule.startswith('/api')]}")  # Debug log
     
     # Create and register Socket.IO blueprint
-    socketio_bp = SocketIOBlueprint(data_store, socketio)
+    socketio_bp = SocketIOBlueprint(data_store, socketio, admission)
     socketio_bp.register()
     
+    rest_endpoints = [
+        'GET /api/health',
+        'GET /api/ready',
+        'GET /api/messages',
+        'POST /api/messages',
+        'GET /api/users',
+        'GET /api/rooms'
+    ]
+    if admission:
+        rest_endpoints.insert(2, 'GET /api/admission')
+    
     # Root endpoint with CORS
     @app.route('/', methods=['GET'])
     def index():
         return jsonify({
             'message': 'Combined REST API + Socket.IO Server with Flask-SocketIO (CORS FIXED!)',
             'endpoints': {
-                'REST': [
-                    'GET /api/health',
-                    'GET /api/messages',
-                    'POST /api/messages',
-                    'GET /api/users',
-                    'GET /api/rooms'
-                ],
+                'REST': rest_endpoints,
                 'Socket.IO': [
                     'connect',
                     'join_room',
@@ -81,16 +133,26 @@ def create_app():
             'timestamp': datetime.now().isoformat()
         })
     
+    readiness.start(socketio)
+    
+    # Startup ends here; freeze the total so /api/ready reports startup time,
+    # not uptime (also when create_app is called without main())
+    profiler.finish()
+    
     return app, socketio
 
 def main():
     """Start the server"""
-    app, socketio = create_app()
+    with profiler.phase('create_app'):
+        app, socketio = create_app()
+    
+    # Debug: Show all registered routes (opt-in, it slows down startup)
+    if os.environ.get('SERVER_DEBUG_ROUTES'):
+        print("🔍 DEBUG: All registered routes:")
+        for rule in app.url_map.iter_rules():
+            print(f"   {rule.methods} {rule.rule} -> {rule.endpoint}")
     
-    # Debug: Show all registered routes
-    print("🔍 DEBUG: All registered routes:")
-    for rule in app.url_map.iter_rules():
-        print(f"   {rule.methods} {rule.rule} -> {rule.endpoint}")
+    profiler.print_report()
     
     print("🚀 Starting Combined REST API + Socket.IO Server with Flask-SocketIO")
     print("📡 REST API available at: http://127.0.0.1:5000")
@@ -1,13 +1,16 @@
 # socketio_blueprint_flask.py - Socket.IO Events Blueprint (Flask-SocketIO version)
+import functools
+
 from flask_socketio import emit, join_room, leave_room
 from flask import request
 
 class SocketIOBlueprint:
     """Blueprint for Flask-SocketIO event handlers"""
     
-    def __init__(self, data_store, socketio):
+    def __init__(self, data_store, socketio, admission=None):
         self.data_store = data_store
         self.socketio = socketio
+        self.admission = admission
         self.name = "flask_socketio_events"
     
     def register(self):
@@ -37,6 +40,7 @@ class SocketIOBlueprint:
             self.data_store.remove_user(sid)
         
         @self.socketio.on('join_room')
+        @self._admitted('join_room')
         def on_join_room(data):
             sid = request.sid
             room_name = data.get('room', 'general')
@@ -73,6 +77,7 @@ class SocketIOBlueprint:
             }
         
         @self.socketio.on('send_message')
+        @self._admitted('send_message')
         def on_send_message(data):
             sid = request.sid
             message_text = data.get('message')
@@ -97,6 +102,7 @@ class SocketIOBlueprint:
             return {'success': True, 'message_id': message['id']}
         
         @self.socketio.on('get_room_info')
+        @self._admitted('get_room_info')
         def on_get_room_info(data):
             sid = request.sid
             user = self.data_store.users.get(sid)
@@ -133,6 +139,31 @@ class SocketIOBlueprint:
         
         print(f"Registered {self.name} blueprint with Flask-SocketIO handlers")
     
+    def _admitted(self, event):
+        """Hold an admission slot for the length of an event handler, or shed it"""
+        def decorator(handler):
+            if self.admission is None:
+                return handler
+            
+            @functools.wraps(handler)
+            def wrapper(*args, **kwargs):
+                lane = self.admission.lane_for_event(event)
+                if not self.admission.try_acquire(lane):
+                    return self._overloaded_response()
+                try:
+                    return handler(*args, **kwargs)
+                finally:
+                    self.admission.release()
+            return wrapper
+        return decorator
+    
+    def _overloaded_response(self):
+        """Ack payload for events shed by admission control"""
+        return {
+            'error': 'Server overloaded, try again later',
+            'retry_after': self.admission.get_retry_after()
+        }
+    
     def _leave_room_helper(self, sid, room_name):
         """Helper function to handle leaving a room"""
         room_info = self.data_store.get_room_info(room_name)
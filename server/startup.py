@@ -0,0 +1,141 @@
+# startup.py - Startup budget profiling and background warm-up / readiness
+# Only stdlib imports here: this module is loaded before eventlet monkey-patches.
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Times each startup phase and checks the total against a budget"""
+
+    def __init__(self, budget_ms=1500):
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter()
+        self.finished = None
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work (imports, app creation, ...)"""
+        phase_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - phase_started) * 1000
+            self.phases.append({'name': name, 'ms': round(elapsed_ms, 2)})
+
+    def finish(self):
+        """Freeze the startup total; call once, just before serving traffic"""
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def elapsed_ms(self):
+        """Startup time so far, or the frozen total once finish() was called"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def over_budget(self):
+        return self.elapsed_ms() > self.budget_ms
+
+    def get_report(self):
+        """Phase timings and budget status"""
+        return {
+            'phases': list(self.phases),
+            'total_ms': round(self.elapsed_ms(), 2),
+            'budget_ms': self.budget_ms,
+            'over_budget': self.over_budget(),
+            'finished': self.finished is not None
+        }
+
+    def print_report(self):
+        """Print phase timings, slowest first"""
+        print(f"⏱️  Startup: {self.elapsed_ms():.1f}ms (budget {self.budget_ms}ms)")
+        for phase in sorted(self.phases, key=lambda p: p['ms'], reverse=True):
+            print(f"   {phase['ms']:>8.1f}ms  {phase['name']}")
+        if self.over_budget():
+            print("⚠️  Startup budget exceeded - run with `python -X importtime server.py` for per-module import times")
+
+
+class Readiness:
+    """Tracks background warm-up tasks; the server is ready once all have finished.
+
+    Failed tasks are retried with exponential backoff. If a task still fails
+    after max_attempts, the worker is marked failed so /api/health can report
+    it and the orchestrator recycles the process.
+    """
+
+    def __init__(self, executor=None, max_attempts=5, retry_backoff=1.0):
+        self.executor = executor
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.tasks = []
+        self.completed = {}
+        self.attempts = {}
+        self.errors = {}
+        self.ready = False
+        self.failed = False
+        self.started_at = None
+        self.ready_at = None
+        self.socketio = None
+
+    def add_task(self, name, func):
+        """Register a warm-up task to run in the background after startup.
+
+        With an executor (server.py passes eventlet.tpool.execute) the task
+        runs on a native thread, so CPU-bound or blocking loaders don't stall
+        the event loop. Such tasks must not use green-only objects (sockets
+        opened on the hub, Socket.IO emits). Without an executor, tasks run on
+        the hub and must yield regularly (e.g. socketio.sleep(0)).
+        """
+        self.tasks.append((name, func))
+
+    def start(self, socketio):
+        """Run warm-up tasks in a background task while the server starts serving"""
+        self.socketio = socketio
+        self.started_at = time.perf_counter()
+        socketio.start_background_task(self._run_tasks)
+
+    def _run_task(self, func):
+        if self.executor:
+            return self.executor(func)
+        return func()
+
+    def _run_tasks(self):
+        for name, func in self.tasks:
+            for attempt in range(1, self.max_attempts + 1):
+                self.attempts[name] = attempt
+                task_started = time.perf_counter()
+                try:
+                    self._run_task(func)
+                except Exception as e:
+                    print(f"❌ Warm-up task '{name}' failed (attempt {attempt}/{self.max_attempts}): {e}")
+                    if attempt == self.max_attempts:
+                        self.errors[name] = str(e)
+                        break
+                    self.socketio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                    continue
+                self.completed[name] = round((time.perf_counter() - task_started) * 1000, 2)
+                break
+
+        if self.errors:
+            self.failed = True
+            print(f"❌ Warm-up failed for {list(self.errors)} - reporting unhealthy so the worker is recycled")
+            return
+
+        self.ready = True
+        self.ready_at = time.perf_counter()
+        print(f"✅ Warm-up complete in {(self.ready_at - self.started_at) * 1000:.1f}ms - ready for traffic")
+
+    def pending(self):
+        return [name for name, _ in self.tasks
+                if name not in self.completed and name not in self.errors]
+
+    def get_status(self):
+        """Readiness snapshot for the /api/ready probe"""
+        return {
+            'ready': self.ready,
+            'failed': self.failed,
+            'completed': dict(self.completed),
+            'pending': self.pending(),
+            'attempts': dict(self.attempts),
+            'errors': dict(self.errors)
+        }
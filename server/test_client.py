@@ -34,6 +34,17 @@ def test_rest_api():
         else:
             print("❌ Health check failed")
             return
+
+        # Readiness probe (503 while warm-up is still running)
+        print("Testing readiness endpoint...")
+        response = requests.get(f"{base_url}/api/ready", timeout=5)
+        data = safe_json_response(response)
+        if data and data.get('ready'):
+            print(f"✅ Ready: startup took {data['startup']['total_ms']}ms")
+        elif response.status_code == 503 and 'Retry-After' in response.headers:
+            print("❌ Server not ready yet (503 with Retry-After)")
+        else:
+            print(f"❌ Readiness check failed: {response.status_code}")
         
         # Send message via REST
         print("Testing message creation...")
@@ -71,6 +82,15 @@ def test_rest_api():
         else:
             print("❌ Rooms retrieval failed")
         
+        # Admission control counters
+        print("Testing admission endpoint...")
+        response = requests.get(f"{base_url}/api/admission", timeout=5)
+        data = safe_json_response(response)
+        if data and 'shed' in data:
+            print(f"✅ Admission: {data['in_flight']} in flight, lag {data['lag_ms']}ms, shed {data['shed']}")
+        else:
+            print("❌ Admission stats retrieval failed")
+
         print("✅ CORS: DEFINITELY Fixed! Flask handles REST API with proper CORS headers!")
         
     except requests.exceptions.ConnectionError:
@@ -211,6 +231,186 @@ def test_socketio():
         import traceback
         traceback.print_exc()
 
+def check(condition, label):
+    '''Print a pass/fail line for an offline check and return the result'''
+    print(f"{'✅' if condition else '❌'} {label}")
+    return condition
+
+def test_admission_control():
+    '''Offline checks for lane thresholds and Retry-After (no server needed)'''
+    from admission_control import AdmissionController, AdmissionMiddleware, PRIORITY, NORMAL, LOW
+    from werkzeug.routing import Map, Rule
+    from werkzeug.test import EnvironBuilder
+
+    print("🚦 Testing admission control...")
+    results = []
+
+    # In-flight thresholds: LOW stops at its own lower cap, NORMAL at max_in_flight,
+    # PRIORITY uses the reserve
+    admission = AdmissionController(None, max_in_flight=3, priority_reserve=1, low_max_in_flight=1)
+    results.append(check(admission.try_acquire(LOW), "LOW admitted below its cap"))
+    results.append(check(not admission.try_acquire(LOW), "LOW shed at its cap"))
+    results.append(check(admission.try_acquire(NORMAL) and admission.try_acquire(NORMAL),
+                         "NORMAL still admitted while LOW is at its cap"))
+    results.append(check(not admission.try_acquire(NORMAL), "NORMAL shed at the in-flight limit"))
+    results.append(check(admission.try_acquire(PRIORITY), "PRIORITY admitted from the reserve"))
+    results.append(check(not admission.try_acquire(PRIORITY), "PRIORITY shed once the reserve is used up"))
+    for _ in range(4):
+        admission.release()
+    results.append(check(admission.in_flight == 0, "Slots released"))
+    admission.release()
+    results.append(check(admission.in_flight == 0, "Double release doesn't go negative"))
+
+    # Lag thresholds: LOW past max_lag_ms, NORMAL past normal_shed_lag_ms, PRIORITY never
+    admission = AdmissionController(None, max_lag_ms=100, normal_shed_lag_ms=300, lag_smoothing=1.0)
+    admission.record_lag_sample(200)
+    results.append(check(not admission.try_acquire(LOW) and admission.try_acquire(NORMAL),
+                         "Moderate lag sheds LOW but not NORMAL"))
+    admission.record_lag_sample(400)
+    results.append(check(not admission.try_acquire(NORMAL) and admission.try_acquire(PRIORITY),
+                         "Heavy lag sheds NORMAL but not PRIORITY"))
+    stats = admission.get_stats()
+    results.append(check(stats['shed'][LOW] == 1 and stats['shed'][NORMAL] == 1,
+                         "Shed counters recorded per lane"))
+
+    # A single spike is smoothed out by the EWMA
+    admission = AdmissionController(None, max_lag_ms=100, lag_smoothing=0.3)
+    admission.record_lag_sample(250)
+    results.append(check(not admission.is_lagging(), "Single lag spike doesn't trigger shedding"))
+
+    # Retry-After scales with lag
+    admission = AdmissionController(None, retry_after=1, lag_smoothing=1.0)
+    results.append(check(admission.get_retry_after() == 1, "Retry-After defaults to the configured minimum"))
+    admission.record_lag_sample(2500)
+    results.append(check(admission.get_retry_after() == 3, "Retry-After scales up with lag"))
+
+    # Middleware: shed LOW gets 503 + Retry-After, PRIORITY gets through, slot held until close
+    def ok_app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'ok']
+
+    url_map = Map([
+        Rule('/api/messages', endpoint='api.get_messages'),
+        Rule('/api/door', endpoint='api.door_op')
+    ])
+    admission = AdmissionController(None, max_lag_ms=100, lag_smoothing=1.0)
+    admission.record_lag_sample(1500)
+    middleware = AdmissionMiddleware(ok_app, admission, url_map)
+    responses = []
+
+    def start_response(status, headers):
+        responses.append((status, dict(headers)))
+
+    middleware(EnvironBuilder(path='/api/messages').get_environ(), start_response)
+    status, headers = responses[-1]
+    results.append(check(status.startswith('503') and headers.get('Retry-After') == '2',
+                         "Shed LOW request gets 503 with Retry-After"))
+
+    body = middleware(EnvironBuilder(path='/api/door').get_environ(), start_response)
+    results.append(check(responses[-1][0].startswith('200'), "PRIORITY request gets through while LOW is shed"))
+    results.append(check(admission.in_flight == 1, "Slot held while the response body is being sent"))
+    body.close()
+    results.append(check(admission.in_flight == 0, "Slot released when the response is closed"))
+
+    # Socket.IO events: a shed event gets the error ack and holds no slot,
+    # and the slot is released even when the handler raises
+    from socketio_blueprint_flask import SocketIOBlueprint
+
+    admission = AdmissionController(None, max_lag_ms=100, lag_smoothing=1.0)
+    admission.record_lag_sample(500)
+    blueprint = SocketIOBlueprint(None, None, admission)
+    calls = []
+    on_get_room_info = blueprint._admitted('get_room_info')(lambda data: calls.append(data))
+    ack = on_get_room_info({})
+    results.append(check(ack.get('error') and 'retry_after' in ack and not calls and admission.in_flight == 0,
+                         "Shed get_room_info returns the error ack without taking a slot"))
+
+    def broken_send(data):
+        raise RuntimeError('handler failed')
+
+    on_send_message = blueprint._admitted('send_message')(broken_send)
+    try:
+        on_send_message({'message': 'hi'})
+    except RuntimeError:
+        pass
+    results.append(check(admission.in_flight == 0, "Event slot released when the handler raises"))
+
+    return all(results)
+
+def test_startup():
+    '''Offline checks for the startup profiler and readiness tracking (no server needed)'''
+    from startup import StartupProfiler, Readiness
+
+    print("⏱️  Testing startup profiler and readiness...")
+    results = []
+
+    # The startup total is frozen by finish() and doesn't grow into uptime
+    profiler = StartupProfiler(budget_ms=50)
+    profiler.finish()
+    total_ms = profiler.get_report()['total_ms']
+    time.sleep(0.1)
+    report = profiler.get_report()
+    results.append(check(report['total_ms'] == total_ms and not report['over_budget'],
+                         "Startup total frozen after finish()"))
+
+    class InlineTasks:
+        '''Stands in for SocketIO: runs background tasks immediately and records sleeps'''
+        def __init__(self):
+            self.sleeps = []
+
+        def start_background_task(self, func):
+            func()
+
+        def sleep(self, seconds):
+            self.sleeps.append(seconds)
+
+    # Not ready while tasks are pending, ready once they all finish;
+    # tasks go through the executor (tpool in server.py)
+    executed = []
+
+    def executor(func):
+        executed.append(func)
+        return func()
+
+    readiness = Readiness(executor=executor)
+    readiness.add_task('load', lambda: None)
+    results.append(check(not readiness.ready and readiness.pending() == ['load'],
+                         "Not ready while warm-up is pending"))
+    readiness.start(InlineTasks())
+    status = readiness.get_status()
+    results.append(check(status['ready'] and 'load' in status['completed'] and not status['pending'],
+                         "Ready once warm-up completes"))
+    results.append(check(len(executed) == 1, "Warm-up tasks run through the executor"))
+
+    # A flaky task is retried with backoff and the server still becomes ready
+    failures = ['timeout', 'timeout']
+
+    def flaky_loader():
+        if failures:
+            raise RuntimeError(failures.pop())
+
+    readiness = Readiness(retry_backoff=0.5)
+    readiness.add_task('flaky', flaky_loader)
+    tasks = InlineTasks()
+    readiness.start(tasks)
+    status = readiness.get_status()
+    results.append(check(status['ready'] and status['attempts'] == {'flaky': 3} and tasks.sleeps == [0.5, 1.0],
+                         "Failed task retried with exponential backoff"))
+
+    # A task that keeps failing marks the worker failed (unhealthy) instead of waiting forever
+    def broken_loader():
+        raise RuntimeError('store unavailable')
+
+    readiness = Readiness(max_attempts=2)
+    readiness.add_task('ok', lambda: None)
+    readiness.add_task('broken', broken_loader)
+    readiness.start(InlineTasks())
+    status = readiness.get_status()
+    results.append(check(not status['ready'] and status['failed'] and status['errors'] == {'broken': 'store unavailable'},
+                         "Worker marked failed when a warm-up task keeps failing"))
+
+    return all(results)
+
 def test_server_availability():
     '''Test if server is running before running other tests'''
     try:
@@ -222,6 +422,15 @@ def test_server_availability():
 if __name__ == "__main__":
     print("🧪 Testing Combined Server - CORS DEFINITELY FIXED!\n")
     
+    # Offline checks first - these don't need the server
+    offline_ok = test_admission_control()
+    print()
+    offline_ok = test_startup() and offline_ok
+    if not offline_ok:
+        print("❌ Offline checks failed")
+        exit(1)
+    print()
+    
     # Check if server is running
     if not test_server_availability():
         print("❌ Server not available at http://localhost:5000")